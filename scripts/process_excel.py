@@ -1,5 +1,173 @@
 import pandas as pd
 import os
+import json
+import typing
+
+# Prefer the Rust-based calamine reader, which pandas supports from 2.2 on, and
+# fall back to streaming the sheet with openpyxl
+try:
+    import python_calamine  # noqa: F401
+
+    _PANDAS_VERSION = tuple(int(part) for part in pd.__version__.split(".")[:2])
+    EXCEL_ENGINE = "calamine" if _PANDAS_VERSION >= (2, 2) else "openpyxl"
+except ImportError:
+    EXCEL_ENGINE = "openpyxl"
+
+# Key of the Parquet sidecar's schema metadata holding the requested column dtypes
+SIDECAR_METADATA_KEY = b"hsi_biopsy.column_dtypes"
+
+
+def _stream_excel_columns(excel_path: str, column_dtypes: dict) -> pd.DataFrame:
+    """
+    Reads the wanted columns of the first sheet with openpyxl in read-only mode.
+
+    Rows are streamed one at a time and only the wanted cells are kept, so the
+    whole workbook is never loaded into memory. Like `pd.read_excel`, blank rows
+    are kept (as missing values) except at the end of the sheet.
+
+    Parameters
+    ----------
+    excel_path : str
+        Path to the input Excel file.
+    column_dtypes : dict
+        Maps the names of the Excel columns to read to their dtype, or to None to
+        let pandas infer it. Columns missing from the sheet are skipped.
+
+    Returns
+    -------
+    pd.DataFrame
+        The selected columns of the first sheet.
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(excel_path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, ())
+        # Only the first column of a repeated header name is read; read_excel
+        # renames the later ones ("name.1", ...), so they are never wanted there
+        wanted = {}
+        for i, name in enumerate(header):
+            if name in column_dtypes and name not in wanted.values():
+                wanted[i] = name
+        columns = {name: [] for name in wanted.values()}
+
+        # Number of rows up to the last one with any non-empty cell (in any column),
+        # trailing blank rows are dropped at the end as read_excel does
+        n_rows = 0
+        for row_number, row in enumerate(rows, start=1):
+            for i, name in wanted.items():
+                columns[name].append(row[i] if i < len(row) else None)
+            if any(value is not None and value != "" for value in row):
+                n_rows = row_number
+    finally:
+        workbook.close()
+
+    columns = {name: values[:n_rows] for name, values in columns.items()}
+
+    df = pd.DataFrame(columns)
+    return df.astype(
+        {c: t for c, t in column_dtypes.items() if t is not None and c in df.columns}
+    )
+
+
+def _sidecar_key(column_dtypes: dict) -> bytes:
+    """Encodes the requested columns and dtypes for the Parquet sidecar metadata."""
+    return json.dumps(column_dtypes, sort_keys=True).encode()
+
+
+def _read_sidecar(
+    sidecar_path: str, excel_path: str, column_dtypes: dict
+) -> typing.Optional[pd.DataFrame]:
+    """
+    Returns the cached sheet if the sidecar is not older than the workbook and was
+    written for the same `column_dtypes`, else None.
+    """
+    if not os.path.exists(sidecar_path) or os.path.getmtime(
+        sidecar_path
+    ) < os.path.getmtime(excel_path):
+        return None
+
+    try:
+        import pyarrow.parquet as pq
+
+        metadata = pq.read_schema(sidecar_path).metadata or {}
+    except Exception as e:
+        print(f"Warning: Could not read Parquet cache '{sidecar_path}': {e}")
+        return None
+    if metadata.get(SIDECAR_METADATA_KEY) != _sidecar_key(column_dtypes):
+        print(
+            f"Parquet cache '{sidecar_path}' was written for other columns, ignoring it"
+        )
+        return None
+
+    print(f"Reading cached sheet from '{sidecar_path}'")
+    return pd.read_parquet(sidecar_path)
+
+
+def _write_sidecar(sidecar_path: str, df: pd.DataFrame, column_dtypes: dict) -> None:
+    """Writes the sheet to the sidecar, tagged with the requested `column_dtypes`."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pandas(df)
+        table = table.replace_schema_metadata(
+            {
+                **(table.schema.metadata or {}),
+                SIDECAR_METADATA_KEY: _sidecar_key(column_dtypes),
+            }
+        )
+        pq.write_table(table, sidecar_path, compression="zstd")
+    except Exception as e:
+        print(f"Warning: Could not write Parquet cache '{sidecar_path}': {e}")
+
+
+def read_biopsy_sheet(excel_path: str, column_dtypes: dict) -> pd.DataFrame:
+    """
+    Reads the wanted columns of the first sheet of the biopsy Excel file.
+
+    Parsing Excel is slow, so the result is cached in a Parquet sidecar file
+    next to the workbook (`<excel_path>.parquet`). The sidecar is reused as long
+    as it is not older than the Excel file and was written for the same
+    `column_dtypes`, which are stored in its schema metadata.
+
+    Parameters
+    ----------
+    excel_path : str
+        Path to the input Excel file (biopsy2.0.xlsx).
+    column_dtypes : dict
+        Maps the names of the Excel columns to read to their dtype, or to None to
+        let pandas infer it. Columns missing from the sheet are skipped.
+
+    Returns
+    -------
+    pd.DataFrame
+        The selected columns of the first sheet.
+    """
+    sidecar_path = excel_path + ".parquet"
+    df = _read_sidecar(sidecar_path, excel_path, column_dtypes)
+    if df is not None:
+        return df
+
+    # Only decode the wanted columns of the first sheet, with their dtypes up front
+    if EXCEL_ENGINE == "calamine":
+        df = pd.read_excel(
+            excel_path,
+            sheet_name=0,
+            engine=EXCEL_ENGINE,
+            usecols=lambda c: c in column_dtypes,
+            dtype={c: t for c, t in column_dtypes.items() if t is not None},
+        )
+    else:
+        df = _stream_excel_columns(excel_path, column_dtypes)
+
+    # Columns left to inference (age) may mix numbers and free text, which Parquet
+    # cannot store in one column; keep such object columns as strings
+    df = df.astype({c: "string" for c in df.columns if df[c].dtype == object})
+
+    _write_sidecar(sidecar_path, df, column_dtypes)
+    return df
 
 
 def process_biopsy_excel(excel_path: str, output_csv_path: str) -> None:
@@ -18,9 +186,6 @@ def process_biopsy_excel(excel_path: str, output_csv_path: str) -> None:
     None
     """
     try:
-        # Read the first sheet of the Excel file
-        df = pd.read_excel(excel_path, sheet_name=0)
-
         # Define the columns to keep and their new names
         columns_map = {
             "HP Sample": "id",
@@ -33,7 +198,23 @@ def process_biopsy_excel(excel_path: str, output_csv_path: str) -> None:
             "ki 67 indice proliferativo ": "Ki-67-index",  # Added trailing space
         }
 
-        # Select and rename columns
+        # Dtypes of the Excel columns; grading and Ki-67 mix numbers and text, so they
+        # are read as strings, while age (None) is left to pandas to infer
+        column_dtypes = {
+            "HP Sample": "string",
+            "age": None,
+            "sex": "string",
+            "Tipo ": "string",
+            "Grading sec WHO 2021": "string",
+            "Additional info": "string",
+            "HISTHOLOGY ": "string",
+            "ki 67 indice proliferativo ": "string",
+        }
+
+        # Read the first sheet of the Excel file (or its cached Parquet copy)
+        df = read_biopsy_sheet(excel_path, column_dtypes)
+
+        # Rename columns (only the mapped columns were read)
         # First, filter out columns that might not exist in the DataFrame to avoid KeyErrors
         existing_columns_to_select = {
             k: v for k, v in columns_map.items() if k in df.columns
@@ -48,8 +229,7 @@ def process_biopsy_excel(excel_path: str, output_csv_path: str) -> None:
                 f"Warning: The following original columns were not found in the Excel sheet and will be skipped: {missing_original_columns}"
             )
 
-        processed_df = df[list(existing_columns_to_select.keys())].copy()
-        processed_df.rename(columns=existing_columns_to_select, inplace=True)
+        processed_df = df.rename(columns=existing_columns_to_select)
 
         # Ensure all target columns are present, fill with NaN if source was missing
         for original_col, new_col_name in columns_map.items():
@@ -2,7 +2,7 @@ import os
 import numpy as np
 import pandas as pd
 import enum
-from typing import List, Dict, Set, Optional, Any, ClassVar
+from typing import List, Dict, Set, Optional, Any, ClassVar, Tuple
 
 # Constants for HSI data directory and metadata CSV path, loaded from environment
 HSI_DATA_DIR = os.environ.get("HSI_DATA_DIR")
@@ -17,38 +17,80 @@ if not HSI_DATA_DIR or not METADATA_CSV_PATH:
     )
 
 
-# Normalize patient IDs for consistent usage (same as in dataset.py)
-def _normalize_id(sample_id):
-    if isinstance(sample_id, str):
-        return sample_id.replace("S.", "S").replace(" ", "").strip()
-    return sample_id
+# Normalize patient IDs for consistent usage (vectorized version of
+# HSIDataset._normalize_id_csv in dataset.py)
+def _normalize_ids(ids: pd.Series) -> pd.Series:
+    if pd.api.types.is_object_dtype(ids) or not pd.api.types.is_string_dtype(ids):
+        ids = ids.astype("string")
+    return (
+        ids.str.replace("S.", "S", regex=False)
+        .str.replace(" ", "", regex=False)
+        .str.strip()
+    )
 
 
-# Load metadata CSV file and create patient ID mappings
-try:
-    _metadata_df = pd.read_csv(METADATA_CSV_PATH)
-    _metadata_df["normalized_id"] = _metadata_df["id"].apply(_normalize_id)
-    _all_patient_ids = _metadata_df["normalized_id"].dropna().unique().tolist()
+# Metadata columns holding a few repeated labels, stored as categoricals
+METADATA_DTYPES = {
+    "sex": "category",
+    "type_of_tumor": "category",
+    "grading": "category",
+}
 
-    # Group patient IDs by tumor type
-    _patient_ids_by_type = {}
-    for tumor_type in _metadata_df["type_of_tumor"].dropna().unique():
-        filtered_ids = (
-            _metadata_df[_metadata_df["type_of_tumor"] == tumor_type]["normalized_id"]
-            .dropna()
-            .tolist()
+
+def load_metadata_csv(metadata_csv_path: str) -> pd.DataFrame:
+    """
+    Reads the processed metadata CSV and indexes it by normalized patient ID.
+
+    Parameters
+    ----------
+    metadata_csv_path : str
+        Path to the processed metadata CSV file.
+
+    Returns
+    -------
+    pd.DataFrame
+        The metadata with an added 'normalized_id' column, which is also used
+        as the index (the column is kept for consistent access).
+    """
+    try:
+        # Multithreaded Arrow parser with Arrow-backed (non-object) string columns
+        metadata_df = pd.read_csv(
+            metadata_csv_path, engine="pyarrow", dtype_backend="pyarrow"
         )
-        _patient_ids_by_type[tumor_type] = filtered_ids
+    except ImportError:
+        metadata_df = pd.read_csv(metadata_csv_path)
+    metadata_df = metadata_df.astype(
+        {c: t for c, t in METADATA_DTYPES.items() if c in metadata_df.columns}
+    )
+    if "id" in metadata_df.columns:
+        metadata_df["normalized_id"] = _normalize_ids(metadata_df["id"])
+        metadata_df = metadata_df.set_index("normalized_id", drop=False)
+    return metadata_df
+
+
+# Load metadata CSV file once and create patient ID mappings.
+# METADATA_DF is shared by all HSIDataset instances, so treat it as read-only.
+try:
+    METADATA_DF = load_metadata_csv(METADATA_CSV_PATH)
+    _all_patient_ids = METADATA_DF["normalized_id"].dropna().unique().tolist()
+
+    # Group patient IDs by tumor type in a single pass
+    _patient_ids_by_type = (
+        METADATA_DF.dropna(subset=["type_of_tumor", "normalized_id"])
+        .groupby("type_of_tumor", observed=True)["normalized_id"]
+        .apply(list)
+        .to_dict()
+    )
 
     print(f"Loaded {len(_all_patient_ids)} patient IDs from metadata CSV")
 except Exception as e:
     print(f"Warning: Could not load patient IDs: {e}")
+    METADATA_DF = pd.DataFrame()
     _all_patient_ids = []
     _patient_ids_by_type = {}
 
 
-# Create an enum-like class with patient IDs as class attributes for autocomplete
-class ALL_PATIENT_IDS:
+class _PatientIDLookup:
     """
     A class containing all normalized patient IDs from the metadata CSV as attributes.
     This provides autocomplete support for patient IDs in IDEs.
@@ -64,30 +106,45 @@ class ALL_PATIENT_IDS:
         glioma_ids = ALL_PATIENT_IDS.get_by_type("Glioma")
     """
 
-    # Class variables to store collections of IDs
-    _all_ids: ClassVar[List[str]] = _all_patient_ids
-    _by_type: ClassVar[Dict[str, List[str]]] = _patient_ids_by_type
+    # Class variables to store collections of IDs, sorted once when the class is created
+    _all_ids: ClassVar[Tuple[str, ...]] = ()
+    _by_type: ClassVar[Dict[str, Tuple[str, ...]]] = {}
+    _types: ClassVar[Tuple[str, ...]] = ()
 
     @classmethod
     def get_all(cls) -> List[str]:
-        """Returns a list of all patient IDs."""
-        return sorted(cls._all_ids)
+        """Returns a sorted list of all patient IDs."""
+        return list(cls._all_ids)
 
     @classmethod
     def get_by_type(cls, tumor_type: str) -> List[str]:
-        """Returns a list of patient IDs filtered by tumor type."""
-        return sorted(cls._by_type.get(tumor_type, []))
+        """Returns a sorted list of patient IDs filtered by tumor type."""
+        return list(cls._by_type.get(tumor_type, ()))
 
     @classmethod
     def get_types(cls) -> List[str]:
-        """Returns a list of all tumor types."""
-        return sorted(list(cls._by_type.keys()))
-
-
-# Dynamically add each patient ID as a class attribute for autocomplete
-for patient_id in _all_patient_ids:
-    if isinstance(patient_id, str):
-        # Convert dots to underscores to create valid attribute names
-        # For example: "S1.2" becomes ALL_PATIENT_IDS.S1_2
-        attr_name = patient_id.replace(".", "_")
-        setattr(ALL_PATIENT_IDS, attr_name, patient_id)
+        """Returns a sorted list of all tumor types."""
+        return list(cls._types)
+
+
+# Create an enum-like class with patient IDs as class attributes for autocomplete.
+# Dots are converted to underscores to create valid attribute names, for example
+# "S1.2" becomes ALL_PATIENT_IDS.S1_2. The attributes are collected in one dict and
+# the class is created in a single step instead of one setattr call per ID.
+_patient_id_attrs = {
+    patient_id.replace(".", "_"): patient_id
+    for patient_id in _all_patient_ids
+    if isinstance(patient_id, str)
+}
+_patient_id_attrs.update(
+    {
+        "__doc__": _PatientIDLookup.__doc__,
+        "_all_ids": tuple(sorted(_all_patient_ids)),
+        "_by_type": {
+            tumor_type: tuple(sorted(ids))
+            for tumor_type, ids in _patient_ids_by_type.items()
+        },
+        "_types": tuple(sorted(_patient_ids_by_type)),
+    }
+)
+ALL_PATIENT_IDS = type("ALL_PATIENT_IDS", (_PatientIDLookup,), _patient_id_attrs)
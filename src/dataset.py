@@ -1,13 +1,26 @@
 import pandas as pd
 import os
 import re
-from scipy.io import loadmat
 import numpy as np
 import typing
+import functools
+import threading
+from collections import OrderedDict, defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
 import h5py
 import torch
 from torch.utils.data import Dataset
-from .constants import HSI_DATA_DIR, METADATA_CSV_PATH
+try:
+    import dask.array as da
+except ImportError:  # dask is optional, lazy cubes are then returned as h5py datasets
+    da = None
+from .constants import HSI_DATA_DIR, METADATA_CSV_PATH, METADATA_DF, load_metadata_csv
+
+# Regex: HyperProbe1.1_Biopsy_ (S<digits>.<digits>) (_FOV(<digits>))? (_BIS)? .mat
+_FNAME_RE = re.compile(r"^HyperProbe1\.1_Biopsy_(S\d+\.\d+)(?:_FOV(\d+))?(?:_BIS)?\.mat$")
+
+# Size of the HDF5 raw data chunk cache used while reading a cube (h5py default is 1 MiB)
+H5_CHUNK_CACHE_BYTES = 64 * 1024**2
 
 
 class HSIDataset(Dataset):
@@ -23,6 +36,11 @@ class HSIDataset(Dataset):
         self,
         hsi_data_dir: str = HSI_DATA_DIR,
         metadata_csv_path: str = METADATA_CSV_PATH,
+        metadata_df: typing.Optional[pd.DataFrame] = None,
+        cache_max_bytes: int = 1024**3,
+        lazy: bool = False,
+        dtype: np.dtype = np.float32,
+        band_stride: int = 1,
     ):
         """
         Initializes the HSIDataset.
@@ -32,45 +50,158 @@ class HSIDataset(Dataset):
         hsi_data_dir : str
             Path to the directory containing HSI .mat files.
         metadata_csv_path : str
-            Path to the processed metadata CSV file.
+            Path to the processed metadata CSV file. The CSV at the default path
+            is parsed and indexed once at import time and shared (read-only)
+            between instances; other paths are read on construction.
+        metadata_df : pd.DataFrame, optional
+            Pre-loaded metadata as returned by `load_metadata_csv`. If given,
+            `metadata_csv_path` is ignored.
+        cache_max_bytes : int, optional
+            Memory budget in bytes for the LRU cache of loaded HSI cubes, so that
+            repeated access to the same file does not re-read it from disk.
+            Set to 0 to disable caching.
+        lazy : bool, optional
+            If True, "hsi_cube" is not read into memory. It is a `dask.array`
+            backed by the HDF5 dataset (or the `h5py.Dataset` itself if dask is
+            not installed), so that only the indexed crop or bands are read.
+            The files stay open until `close()` is called, and lazy cubes are
+            not cached. Without dask, the `h5py.Dataset` keeps its stored dtype
+            (convert it when indexing) and `band_stride` must be 1.
+        dtype : np.dtype, optional
+            Data type the cubes are converted to while reading. np.float16 halves
+            memory and bandwidth compared to the default np.float32.
+        band_stride : int, optional
+            Keep only every `band_stride`-th spectral band; the wavelengths of the
+            kept bands are `WAVELENGTHS[::band_stride]`. Must be an integer >= 1
+            (exactly 1 for lazy cubes without dask), otherwise a ValueError is raised.
         """
-        self.hsi_data_dir = hsi_data_dir
-        try:
-            self.metadata_df = pd.read_csv(metadata_csv_path)
-        except FileNotFoundError:
-            print(f"Error: Metadata CSV file not found at {metadata_csv_path}")
-            self.metadata_df = pd.DataFrame()  # Empty DataFrame
-        except Exception as e:
-            print(f"Error reading metadata CSV {metadata_csv_path}: {e}")
-            self.metadata_df = pd.DataFrame()
+        if (
+            not isinstance(band_stride, (int, np.integer))
+            or isinstance(band_stride, bool)
+            or band_stride < 1
+        ):
+            raise ValueError(f"band_stride must be an integer >= 1, got {band_stride!r}")
+        if lazy and da is None and band_stride != 1:
+            # The raw h5py.Dataset cannot apply the stride, so its bands would not
+            # line up with WAVELENGTHS[::band_stride]
+            raise ValueError("lazy=True with band_stride != 1 requires dask")
 
-        if not self.metadata_df.empty and "id" in self.metadata_df.columns:
-            self.metadata_df["normalized_id"] = self.metadata_df["id"].apply(
-                self._normalize_id_csv
-            )
-            self.metadata_df.set_index(
-                "normalized_id", inplace=True, drop=False
-            )  # Keep 'id' column too
+        self.hsi_data_dir = hsi_data_dir
+        self.cache_max_bytes = cache_max_bytes
+        self.lazy = lazy
+        self.dtype = np.dtype(dtype)
+        self.band_stride = band_stride
+        self._cube_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._cube_cache_bytes = 0
+        self._init_background_state()
+        if metadata_df is not None:
+            self.metadata_df = metadata_df
+        elif metadata_csv_path == METADATA_CSV_PATH:
+            # Shared, already indexed metadata; never modified in place
+            self.metadata_df = METADATA_DF
         else:
+            try:
+                self.metadata_df = load_metadata_csv(metadata_csv_path)
+            except FileNotFoundError:
+                print(f"Error: Metadata CSV file not found at {metadata_csv_path}")
+                self.metadata_df = pd.DataFrame()  # Empty DataFrame
+            except Exception as e:
+                print(f"Error reading metadata CSV {metadata_csv_path}: {e}")
+                self.metadata_df = pd.DataFrame()
+
+        if self.metadata_df.empty or "normalized_id" not in self.metadata_df.index.names:
             print(
                 "Warning: Metadata DataFrame is empty or 'id' column is missing. No metadata will be loaded."
             )
             # Ensure 'normalized_id' column exists even if empty for consistent access
+            # (assign returns a new frame, the shared metadata is left untouched)
             if "normalized_id" not in self.metadata_df.columns:
-                self.metadata_df["normalized_id"] = pd.Series(dtype="str")
-
-        # Each sample is a single HSI cube now, rather than a patient with multiple FOVs
-        self.cube_samples = self._find_cube_samples()
-        self.cube_samples.sort(key=lambda x: x["combined_id"])
+                self.metadata_df = self.metadata_df.assign(
+                    normalized_id=pd.Series(dtype="str")
+                )
+
+        # Repeated metadata rows are ignored, each cube uses the first entry
+        duplicated = self.metadata_df.index.duplicated(keep="first")
+        self._duplicated_ids = set(self.metadata_df.index[duplicated])
+
+        # Each sample is a single HSI cube, stored column-wise as one table row
+        # indexed by combined_id
+        self._cubes_df = (
+            self._find_cube_samples()
+            .sort_values("combined_id", ignore_index=True)
+            .set_index("combined_id", drop=False)
+        )
+
+        # Integer position of each cube's metadata row in metadata_df, the row
+        # itself is only looked up in __getitem__
+        unique_rows = np.flatnonzero(~duplicated)
+        unique_index = self.metadata_df.index[unique_rows]
+        self._cubes_df["patient_idx"] = unique_rows[
+            unique_index.get_indexer(self._cubes_df["patient_id"])
+        ]
 
         # Dictionary for faster sample lookups by combined_id
-        self.sample_map = {s["combined_id"]: i for i, s in enumerate(self.cube_samples)}
+        self.sample_map = {
+            combined_id: i for i, combined_id in enumerate(self._cubes_df["combined_id"])
+        }
+
+        # Dictionary mapping each patient ID (e.g. "S1.2") to the indices of its cubes
+        patient_index = defaultdict(list)
+        for i, cube_patient_id in enumerate(self._cubes_df["patient_id"]):
+            patient_index[cube_patient_id].append(i)
+        self.patient_index: typing.Dict[str, typing.List[int]] = dict(patient_index)
+
+        # List of per-cube dicts for `cube_samples`, built on first access
+        self._cube_samples: typing.Optional[typing.List[dict]] = None
 
         # ensure proper Dataset behavior
         super().__init__()
 
+    def _init_background_state(self) -> None:
+        """
+        (Re)creates the cache lock, the lazily started prefetch executor and the
+        registry of HDF5 files kept open for lazy cubes.
+        """
+        # Process that owns this state, see `_check_background_state`
+        self._background_pid = os.getpid()
+        self._cache_lock = threading.Lock()
+        self._executor: typing.Optional[ThreadPoolExecutor] = None
+        self._prefetch: typing.Dict[str, Future] = {}
+        self._open_files: typing.Dict[str, h5py.File] = {}
+
+    def _check_background_state(self) -> None:
+        """
+        Starts with fresh background state after a fork (e.g. a DataLoader worker
+        on Linux). The child has none of the parent's threads, so pending prefetch
+        futures would never finish and the lock may be held forever; the inherited
+        HDF5 handles are not shared safely either. Loaded cubes are kept.
+        """
+        if self._background_pid != os.getpid():
+            self._init_background_state()
+
+    def __getstate__(self) -> dict:
+        # Locks, thread pools, futures and open files cannot be pickled (e.g. when a
+        # DataLoader sends the dataset to worker processes); each copy starts with an
+        # empty cache.
+        state = self.__dict__.copy()
+        for key in (
+            "_background_pid",
+            "_cache_lock",
+            "_executor",
+            "_prefetch",
+            "_open_files",
+        ):
+            state.pop(key, None)
+        state["_cube_cache"] = OrderedDict()
+        state["_cube_cache_bytes"] = 0
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._init_background_state()
+
     def _normalize_id_csv(self, sample_id: any) -> typing.Union[str, any]:
-        """Normalizes sample IDs from the CSV for consistent matching."""
+        """Normalizes a queried sample ID the same way the metadata CSV IDs are normalized."""
         if isinstance(sample_id, str):
             return sample_id.replace("S.", "S").replace(" ", "").strip()
         return sample_id
@@ -89,73 +220,85 @@ class HSIDataset(Dataset):
             return sample_id[1:]
         return sample_id
 
-    def _find_cube_samples(self) -> list:
+    def _find_cube_samples(self) -> pd.DataFrame:
         """
         Scans the HSI data directory and treats each HSI cube as a separate sample.
         Each sample gets a unique combined_id of format "patient_number_fov_number".
+
+        Returns
+        -------
+        pd.DataFrame
+            One row per cube with the columns "combined_id", "patient_id", "fov"
+            and "file_path". Only cubes with matching metadata are included.
         """
-        cube_samples = []
-        # Regex: HyperProbe1.1_Biopsy_ (S<digits>.<digits>) (_FOV(<digits>))? .mat
-        pattern = re.compile(r"^HyperProbe1\.1_Biopsy_(S\d+\.\d+)(?:_FOV(\d+))?(?:_BIS)?\.mat$")
+        cube_columns = {"combined_id": [], "patient_id": [], "fov": [], "file_path": []}
 
         if not os.path.isdir(self.hsi_data_dir):
             print(f"Error: HSI data directory not found at {self.hsi_data_dir}")
-            return []
-
-        for filename in os.listdir(self.hsi_data_dir):
-            match = pattern.match(filename)
-            if match:
-                raw_sample_id_part = match.group(1)  # e.g., "S1.2"
-                fov_number_str = match.group(2)  # e.g., "1" or None
-
-                # Default FOV is "1" if not specified
-                fov_key = fov_number_str if fov_number_str else "1"
-
-                normalized_file_id = self._normalize_id_filename(raw_sample_id_part)
-                patient_number = self._extract_patient_number(normalized_file_id)
-
-                # Create a combined ID like "1.2_3" for patient S1.2 FOV 3
-                combined_id = f"{patient_number}_{fov_key}"
-
-                if (
-                    not self.metadata_df.empty
-                    and "normalized_id" in self.metadata_df.index.names
-                    and normalized_file_id in self.metadata_df.index
-                ):
-                    file_path = os.path.join(self.hsi_data_dir, filename)
-
-                    # Ensure metadata is a dict, even if multiple rows match (should not happen with set_index)
-                    meta_entry = self.metadata_df.loc[normalized_file_id]
-                    if isinstance(
-                        meta_entry, pd.DataFrame
-                    ):  # if somehow index is not unique
-                        metadata = meta_entry.iloc[0].to_dict()
+            return pd.DataFrame(cube_columns)
+
+        with os.scandir(self.hsi_data_dir) as entries:
+            for entry in entries:
+                filename = entry.name
+                match = _FNAME_RE.match(filename)
+                if match:
+                    raw_sample_id_part = match.group(1)  # e.g., "S1.2"
+                    fov_number_str = match.group(2)  # e.g., "1" or None
+
+                    # Default FOV is "1" if not specified
+                    fov_key = fov_number_str if fov_number_str else "1"
+
+                    normalized_file_id = self._normalize_id_filename(raw_sample_id_part)
+                    patient_number = self._extract_patient_number(normalized_file_id)
+
+                    # Create a combined ID like "1.2_3" for patient S1.2 FOV 3
+                    combined_id = f"{patient_number}_{fov_key}"
+
+                    if (
+                        not self.metadata_df.empty
+                        and "normalized_id" in self.metadata_df.index.names
+                        and normalized_file_id in self.metadata_df.index
+                    ):
+                        file_path = entry.path
+
+                        if normalized_file_id in self._duplicated_ids:  # if somehow index is not unique
+                            print(
+                                f"Warning: Multiple metadata entries for {normalized_file_id}, using first."
+                            )
+
+                        # Each sample is a single HSI cube
+                        cube_columns["combined_id"].append(combined_id)  # Unique ID for each cube (patient_fov)
+                        cube_columns["patient_id"].append(normalized_file_id)  # Original patient ID (e.g., S1.2)
+                        cube_columns["fov"].append(fov_key)  # FOV number
+                        cube_columns["file_path"].append(file_path)  # Path to the .mat file
+                    else:
                         print(
-                            f"Warning: Multiple metadata entries for {normalized_file_id}, using first."
+                            f"Warning: Metadata not found for sample ID '{normalized_file_id}' from file '{filename}' (normalized from '{raw_sample_id_part}')"
                         )
-                    else:
-                        metadata = meta_entry.to_dict()
-
-                    # Each sample is a single HSI cube
-                    cube_samples.append(
-                        {
-                            "combined_id": combined_id,  # Unique ID for each cube (patient_fov)
-                            "patient_id": normalized_file_id,  # Original patient ID (e.g., S1.2)
-                            "fov": fov_key,  # FOV number
-                            "file_path": file_path,  # Path to the .mat file
-                            "metadata": metadata,  # Associated metadata
-                        }
-                    )
-                else:
-                    print(
-                        f"Warning: Metadata not found for sample ID '{normalized_file_id}' from file '{filename}' (normalized from '{raw_sample_id_part}')"
-                    )
-
-        return cube_samples
+
+        return pd.DataFrame(cube_columns)
+
+    @property
+    def cube_samples(self) -> typing.List[dict]:
+        """
+        The cubes of the dataset as a list of dicts with the keys "combined_id",
+        "patient_id", "fov", "file_path" and "metadata", in dataset order.
+
+        The list is built on first access and then reused, so indexing it in a
+        loop is cheap; treat it as read-only.
+        """
+        if self._cube_samples is None:
+            records = self._cubes_df[
+                ["combined_id", "patient_id", "fov", "file_path"]
+            ].to_dict("records")
+            for record, patient_idx in zip(records, self._cubes_df["patient_idx"]):
+                record["metadata"] = self._metadata_record(patient_idx)
+            self._cube_samples = records
+        return self._cube_samples
 
     def __len__(self) -> int:
         """Returns the number of individual HSI cubes in the dataset."""
-        return len(self.cube_samples)
+        return len(self._cubes_df)
 
     def __getitem__(self, idx: int) -> dict:
         """
@@ -173,29 +316,50 @@ class HSIDataset(Dataset):
             - combined_id: Unique identifier of format "patient_number_fov_number"
             - patient_id: The patient identifier (e.g., "S1.2")
             - fov: The field of view number
-            - hsi_cube: The hyperspectral cube data
+            - hsi_cube: The hyperspectral cube data, shaped (bands, height, width)
             - metadata: Associated metadata from the CSV
         """
+        self._check_background_state()
+
         # Validate index
-        if idx < 0 or idx >= len(self.cube_samples):
+        if idx < 0 or idx >= len(self._cubes_df):
             raise IndexError("Sample index out of range.")
 
-        sample_info = self.cube_samples[idx]
+        sample_info = self._cubes_df.iloc[idx]
 
-        # Lazy loading of the HSI cube data
-        hsi_cube = self._load_hsi_cube(sample_info["file_path"])
+        # Lazy loading of the HSI cube data, waiting for an in-flight prefetch if
+        # any (finished prefetches are served from the cube cache)
+        future = self._prefetch.get(sample_info["file_path"])
+        if future is not None:
+            hsi_cube = future.result()
+        else:
+            hsi_cube = self._load_hsi_cube(sample_info["file_path"])
 
         return {
             "combined_id": sample_info["combined_id"],
             "patient_id": sample_info["patient_id"],
             "fov": sample_info["fov"],
             "hsi_cube": hsi_cube,
-            "metadata": sample_info["metadata"],
+            "metadata": self._metadata_record(sample_info["patient_idx"]),
+        }
+
+    def _metadata_record(self, patient_idx: int) -> dict:
+        """
+        Returns the metadata row at position `patient_idx` as a dict.
+
+        Missing values are returned as np.nan, whatever the column's dtype (the
+        Arrow-backed columns yield None or pd.NA), so that every sample uses the
+        same missing marker and torch's default_collate accepts the dict.
+        """
+        record = self.metadata_df.iloc[patient_idx].to_dict()
+        return {
+            key: np.nan if pd.api.types.is_scalar(value) and pd.isna(value) else value
+            for key, value in record.items()
         }
 
     def _load_hsi_cube(self, file_path: str) -> np.ndarray:
         """
-        Loads a single HSI cube from a .mat file.
+        Loads a single HSI cube from a .mat file, using the LRU cube cache.
 
         Parameters
         ----------
@@ -205,16 +369,149 @@ class HSIDataset(Dataset):
         Returns
         -------
         np.ndarray or None
-            The HSI cube data as a numpy array, or None if loading fails.
+            The HSI cube data as a C-contiguous (bands, height, width) array of
+            `self.dtype` with every `self.band_stride`-th band, or None if loading
+            fails. The array is read-only because cached cubes are shared between
+            calls; copy it before modifying it in place.
         """
+        if self.lazy:
+            return self._open_lazy_cube(file_path)
+
+        with self._cache_lock:
+            hsi_cube = self._cube_cache.get(file_path)
+            if hsi_cube is not None:
+                self._cube_cache.move_to_end(file_path)
+                return hsi_cube
+
         try:
-            with h5py.File(file_path, "r") as f:
+            with h5py.File(file_path, "r", rdcc_nbytes=H5_CHUNK_CACHE_BYTES) as f:
                 dset = f["Ref_hyper"]
-                return dset[...]
+                # h5py reverses MATLAB's column-major dimensions, so the bands are
+                # already the first (slowest varying) axis and every band image is
+                # one contiguous block, which keeps per-band reductions such as
+                # cube.mean(axis=(1, 2)) on contiguous memory. Convert while
+                # reading, without a full-precision intermediate copy.
+                hsi_cube = np.ascontiguousarray(
+                    dset.astype(self.dtype)[:: self.band_stride]
+                )
         except Exception as e:
             print(f"Error loading HSI data from {file_path}: {e}")
             return None
 
+        # Later reads of the same file get this array from the cache, so in-place
+        # changes must not be possible
+        hsi_cube.setflags(write=False)
+        with self._cache_lock:
+            self._add_to_cube_cache(file_path, hsi_cube)
+        return hsi_cube
+
+    def _open_lazy_cube(
+        self, file_path: str
+    ) -> typing.Union["da.Array", h5py.Dataset, None]:
+        """
+        Returns the HSI cube of a .mat file without reading its data.
+
+        Parameters
+        ----------
+        file_path : str
+            Path to the .mat file containing the HSI cube.
+
+        Returns
+        -------
+        dask.array.Array, h5py.Dataset or None
+            A dask array over the "Ref_hyper" dataset if dask is installed, else
+            the dataset itself, or None if opening the file fails.
+        """
+        try:
+            with self._cache_lock:
+                h5_file = self._open_files.get(file_path)
+                if h5_file is None:
+                    h5_file = h5py.File(file_path, "r", rdcc_nbytes=H5_CHUNK_CACHE_BYTES)
+                    self._open_files[file_path] = h5_file
+            dset = h5_file["Ref_hyper"]
+        except Exception as e:
+            print(f"Error loading HSI data from {file_path}: {e}")
+            return None
+
+        if da is not None:
+            cube = da.from_array(dset, chunks="auto")[:: self.band_stride]
+            return cube.astype(self.dtype)
+        return dset
+
+    def close(self) -> None:
+        """
+        Stops the prefetch threads, cancelling queued reads, and closes the HDF5
+        files kept open for lazily loaded cubes.
+        """
+        self._check_background_state()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+        with self._cache_lock:
+            for h5_file in self._open_files.values():
+                h5_file.close()
+            self._open_files.clear()
+
+    def _add_to_cube_cache(self, file_path: str, hsi_cube: np.ndarray) -> None:
+        """
+        Stores a cube in the LRU cache, evicting the least recently used cubes.
+        Must be called with `_cache_lock` held.
+        """
+        if hsi_cube.nbytes > self.cache_max_bytes:
+            return
+
+        # Another thread may have loaded and cached the same file in the meantime
+        previous = self._cube_cache.pop(file_path, None)
+        if previous is not None:
+            self._cube_cache_bytes -= previous.nbytes
+
+        self._cube_cache[file_path] = hsi_cube
+        self._cube_cache_bytes += hsi_cube.nbytes
+        while self._cube_cache_bytes > self.cache_max_bytes:
+            _, evicted = self._cube_cache.popitem(last=False)
+            self._cube_cache_bytes -= evicted.nbytes
+
+    def prefetch(self, indices: typing.Iterable[int]) -> None:
+        """
+        Starts loading the HSI cubes of the given samples in background threads.
+
+        A later `__getitem__` for one of these indices waits for the pending read
+        instead of reading the file again, so disk I/O overlaps with whatever the
+        caller does in the meantime. Only in-flight reads are tracked; finished
+        cubes go to the LRU cache and are subject to `cache_max_bytes` like any
+        other read, so a cube that does not fit is read again when requested
+        after its prefetch has finished.
+
+        Parameters
+        ----------
+        indices : iterable of int
+            Indices of the samples to load ahead of time.
+        """
+        self._check_background_state()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=os.cpu_count())
+
+        for idx in indices:
+            if idx < 0 or idx >= len(self._cubes_df):
+                raise IndexError("Sample index out of range.")
+
+            file_path = self._cubes_df["file_path"].iat[idx]
+            with self._cache_lock:
+                if file_path in self._prefetch or file_path in self._cube_cache:
+                    continue
+                future = self._executor.submit(self._load_hsi_cube, file_path)
+                self._prefetch[file_path] = future
+            future.add_done_callback(
+                functools.partial(self._finish_prefetch, file_path)
+            )
+
+    def _finish_prefetch(self, file_path: str, future: Future) -> None:
+        """Forgets a finished prefetch, its cube (if it fits) is in the cube cache."""
+        with self._cache_lock:
+            if self._prefetch.get(file_path) is future:
+                del self._prefetch[file_path]
+
     def get_sample_by_combined_id(self, combined_id: str) -> typing.Union[dict, None]:
         """
         Retrieves a sample by its combined ID (patient_number_fov).
@@ -235,7 +532,7 @@ class HSIDataset(Dataset):
         print(f"Sample with combined ID '{combined_id}' not found.")
         return None
 
-    def get_samples_by_patient_id(self, patient_id: str) -> typing.List[dict]:
+    def get_samples_by_patient_id(self, patient_id: str) -> typing.Iterator[dict]:
         """
         Retrieves all samples (FOVs) for a specific patient ID.
 
@@ -246,28 +543,23 @@ class HSIDataset(Dataset):
 
         Returns
         -------
-        list of dict
-            A list of all samples for the given patient, empty if none found.
+        iterator of dict
+            A generator over all samples for the given patient, empty if none
+            found. Each HSI cube is only loaded when its sample is reached, so
+            wrap the result in `list()` if all samples are needed at once.
         """
         normalized_id = self._normalize_id_csv(patient_id)
 
-        # Strip "S" prefix if present for matching with combined_id format
-        if normalized_id.startswith("S"):
-            patient_number = normalized_id[1:]
-        else:
-            patient_number = normalized_id
-
-        samples = []
-        for idx, sample in enumerate(self.cube_samples):
-            if sample["combined_id"].startswith(f"{patient_number}_"):
-                samples.append(self.__getitem__(idx))
+        # Cube patient IDs always carry the "S" prefix (e.g. "S1.2"), also accept "1.2"
+        file_patient_id = f"S{self._extract_patient_number(normalized_id)}"
 
-        if not samples:
+        indices = self.patient_index.get(file_patient_id, [])
+        if not indices:
             print(
                 f"No samples found for patient ID '{patient_id}' (normalized: '{normalized_id}')."
             )
 
-        return samples
+        return (self.__getitem__(idx) for idx in indices)
 
     def get_sample_by_patient_and_fov(
         self, patient_id: str, fov: str
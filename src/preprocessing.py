@@ -7,6 +7,17 @@ hyperspectral imaging data from biopsy samples.
 
 import numpy as np
 
+try:
+    import numba
+except ImportError:  # numba is optional, normalize_spectra then falls back to NumPy
+    numba = None
+
+NORMALIZATION_METHODS = ("minmax", "standard")
+
+# fastmath flags for the kernels; "nnan" and "ninf" are left out so that the
+# NaN checks below are not optimized away
+_FASTMATH_FLAGS = {"nsz", "arcp", "contract", "afn", "reassoc"}
+
 
 def load_hsi_data(file_path):
     """
@@ -30,17 +41,97 @@ def normalize_spectra(hsi_data, method="minmax"):
     """
     Normalize spectral data
 
+    Each band is normalized independently using statistics over all of its
+    pixels. NaN values are ignored when computing the statistics and stay NaN
+    in the output. If numba is installed, the statistics and the scaling are
+    computed in one compiled kernel that runs in parallel over the bands;
+    otherwise NumPy is used.
+
     Parameters
     ----------
     hsi_data : np.ndarray
-        Hyperspectral data cube
+        Hyperspectral data cube with the bands along the first axis, e.g.
+        (bands, height, width)
     method : str, optional
-        Normalization method ('minmax', 'standard', etc.)
+        Normalization method: 'minmax' scales each band to [0, 1], 'standard'
+        scales each band to zero mean and unit variance
 
     Returns
     -------
     np.ndarray
-        Normalized hyperspectral data
+        Normalized hyperspectral data with the same shape as `hsi_data`, as
+        float32 (or float64 for float64 and wide integer input)
     """
-    # Placeholder for actual implementation
-    raise NotImplementedError("Function not implemented yet")
+    if method not in NORMALIZATION_METHODS:
+        raise ValueError(
+            f"Unknown normalization method '{method}', expected one of {NORMALIZATION_METHODS}"
+        )
+
+    hsi_data = np.asarray(hsi_data)
+    out_dtype = np.result_type(hsi_data.dtype, np.float32)
+    # View as (bands, pixels) so the kernels only deal with one layout
+    bands = np.ascontiguousarray(hsi_data, dtype=out_dtype).reshape(
+        hsi_data.shape[0], -1
+    )
+    out = np.empty_like(bands)
+
+    if numba is None:
+        _normalize_bands_numpy(bands, method, out)
+    elif method == "minmax":
+        _minmax_spectra(bands, out)
+    else:
+        _standard_spectra(bands, out)
+
+    return out.reshape(hsi_data.shape)
+
+
+def _normalize_bands_numpy(bands, method, out):
+    """NumPy fallback of the numba kernels, writing into `out` to avoid temporaries."""
+    if method == "minmax":
+        lo = np.nanmin(bands, axis=1, keepdims=True)
+        span = np.nanmax(bands, axis=1, keepdims=True) - lo
+        np.subtract(bands, lo, out=out)
+    else:
+        lo = np.nanmean(bands, axis=1, keepdims=True)
+        span = np.nanstd(bands, axis=1, keepdims=True)
+        np.subtract(bands, lo, out=out)
+
+    # Constant bands map to 0 instead of dividing by zero
+    scale = np.divide(1.0, span, out=np.zeros_like(span), where=span > 0)
+    np.multiply(out, scale, out=out)
+
+
+if numba is not None:
+
+    @numba.njit(parallel=True, fastmath=_FASTMATH_FLAGS, cache=True)
+    def _minmax_spectra(bands, out):
+        for b in numba.prange(bands.shape[0]):
+            lo = np.inf
+            hi = -np.inf
+            for i in range(bands.shape[1]):
+                v = bands[b, i]
+                if v == v:  # skip NaN
+                    lo = min(lo, v)
+                    hi = max(hi, v)
+            scale = 1.0 / (hi - lo) if hi > lo else 0.0
+            for i in range(bands.shape[1]):
+                out[b, i] = (bands[b, i] - lo) * scale
+
+    @numba.njit(parallel=True, fastmath=_FASTMATH_FLAGS, cache=True)
+    def _standard_spectra(bands, out):
+        for b in numba.prange(bands.shape[0]):
+            # Welford's algorithm: mean and variance in a single pass
+            n = 0
+            mean = 0.0
+            m2 = 0.0
+            for i in range(bands.shape[1]):
+                v = bands[b, i]
+                if v == v:  # skip NaN
+                    n += 1
+                    delta = v - mean
+                    mean += delta / n
+                    m2 += delta * (v - mean)
+            std = np.sqrt(m2 / n) if n > 0 else 0.0
+            scale = 1.0 / std if std > 0 else 0.0
+            for i in range(bands.shape[1]):
+                out[b, i] = (bands[b, i] - mean) * scale
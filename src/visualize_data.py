@@ -1,25 +1,123 @@
+import functools
+import weakref
+from collections import OrderedDict
 import numpy as np
 from .constants import WAVELENGTHS
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
+from matplotlib.colors import to_rgba
+from matplotlib.lines import Line2D
 import ipywidgets as widgets
 from IPython.display import display
 
+# float32 copy of the band wavelengths for nearest-band lookups, which binary
+# search the (increasing) wavelengths
+_WL = np.ascontiguousarray(WAVELENGTHS, dtype=np.float32)
+assert np.all(np.diff(_WL) > 0), "WAVELENGTHS must be strictly increasing"
+
+
+def _nearest_band_indices(bands):
+    """Returns the index of the band closest to each wavelength in nm (ties go to the lower band)."""
+    bands = np.asarray(bands, dtype=np.float32)
+    upper = np.clip(np.searchsorted(_WL, bands), 1, len(_WL) - 1)
+    lower = upper - 1
+    return np.where(bands - _WL[lower] <= _WL[upper] - bands, lower, upper)
+
+
+# Lookup table from integer wavelength (nm) in the covered range to the nearest band
+_LUT_MIN_NM = int(np.floor(WAVELENGTHS[0]))
+_LUT_MAX_NM = int(np.ceil(WAVELENGTHS[-1]))
+_BAND_LUT = _nearest_band_indices(np.arange(_LUT_MIN_NM, _LUT_MAX_NM + 1))
+
+
+def _nearest_band(band):
+    """Returns the index of the band closest to the given wavelength in nm."""
+    if float(band).is_integer() and _LUT_MIN_NM <= band <= _LUT_MAX_NM:
+        return int(_BAND_LUT[int(band) - _LUT_MIN_NM])
+    return int(_nearest_band_indices(band))
+
+
+@functools.lru_cache(maxsize=None)
+def _rgb_band_indices(r_band, g_band, b_band):
+    """Returns the nearest band indices for an (r, g, b) wavelength triple."""
+    return _nearest_band(r_band), _nearest_band(g_band), _nearest_band(b_band)
+
+
+# Recently created RGB composites, keyed by (id(hsi_data), r_band, g_band, b_band).
+# Each entry holds a weak reference to its cube, which both checks that the id
+# was not reused by another array and drops the entry once the cube is freed.
+_RGB_CACHE_SIZE = 8
+_rgb_cache = OrderedDict()
+
+# Initial capacity of the selected-pixel buffers in the interactive viewer (grown on demand)
+_MAX_SELECTED_PIXELS = 1024
+
+# Delay in ms used to coalesce redraws after clicks in the interactive viewer
+_DRAW_DELAY_MS = 10
+
+# RGBA palette cycled through by the selected pixels in the interactive viewer
+_SELECTION_COLORS = np.array(
+    [to_rgba(c) for c in ["b", "g", "r", "c", "m", "y", "k"]], dtype=np.float32
+)
+
+
+def _find_selected(xs, ys, n, x, y):
+    """Returns the index of pixel (x, y) in the first `n` entries of `xs`/`ys`, or -1."""
+    idx = np.flatnonzero((xs[:n] == x) & (ys[:n] == y))
+    return int(idx[0]) if idx.size else -1
+
 
 def create_rgb(hsi_data, r_band=650, g_band=550, b_band=450):
     """
     Create an (H, W, 3) RGB image from a hyperspectral cube,
     performing per-channel min-max normalization while handling NaN and infinite values.
+
+    The result is cached per cube object and band triple and returned read-only;
+    it is not recomputed if the cube is modified in place.
     """
-    # pick nearest bands
-    r_idx = np.argmin(np.abs(WAVELENGTHS - r_band))
-    g_idx = np.argmin(np.abs(WAVELENGTHS - g_band))
-    b_idx = np.argmin(np.abs(WAVELENGTHS - b_band))
+    key = (id(hsi_data), r_band, g_band, b_band)
+    entry = _rgb_cache.get(key)
+    if entry is not None and entry[0]() is hsi_data:
+        _rgb_cache.move_to_end(key)
+        return entry[1]
+
+    rgb = _compute_rgb(hsi_data, r_band, g_band, b_band)
+    rgb.setflags(write=False)
+
+    try:
+        cube_ref = weakref.ref(hsi_data, lambda _, key=key: _rgb_cache.pop(key, None))
+    except TypeError:  # cube type does not support weak references, skip caching
+        return rgb
+    _rgb_cache[key] = (cube_ref, rgb)
+    if len(_rgb_cache) > _RGB_CACHE_SIZE:
+        _rgb_cache.popitem(last=False)
+
+    return rgb
 
-    # stack into H×W×3 and cast to float32
-    rgb = np.stack([hsi_data[r_idx], hsi_data[g_idx], hsi_data[b_idx]], axis=-1).astype(
-        np.float32
-    )
 
+def _compute_rgb(hsi_data, r_band, g_band, b_band):
+    """Builds the RGB composite for `create_rgb`, without caching."""
+    # pick nearest bands
+    r_idx, g_idx, b_idx = _rgb_band_indices(r_band, g_band, b_band)
+
+    # copy each band into its float32 channel and min-max normalize it in place
+    # (np.asarray reads lazily loaded bands)
+    height, width = hsi_data.shape[1:]
+    rgb = np.empty((height, width, 3), dtype=np.float32)
+    for c, band_idx in enumerate((r_idx, g_idx, b_idx)):
+        channel = rgb[..., c]
+        np.copyto(channel, np.asarray(hsi_data[band_idx]), casting="unsafe")
+
+        # range over finite values only, NaN and inf are mapped below
+        finite = channel[np.isfinite(channel)]
+        if finite.size == 0:
+            continue
+        lo, hi = finite.min(), finite.max()
+        scale = np.float32(1.0 / (hi - lo)) if hi > lo else np.float32(0.0)
+        np.subtract(channel, lo, out=channel)
+        np.multiply(channel, scale, out=channel)
+
+    np.nan_to_num(rgb, copy=False, nan=0.0, posinf=1.0, neginf=0.0)
     return rgb
 
 
@@ -32,24 +130,83 @@ def show_interactive_image_with_spectrum(hsi_data, r_band=650, g_band=550, b_ban
     # Create a figure with two subplots
     fig, (ax_img, ax_spec) = plt.subplots(1, 2, figsize=(12, 6))
 
-    # Display the RGB image
-    ax_img.imshow(rgb)
+    # Display the RGB image; it is part of the static background of the blitted
+    # updates and only redrawn when the bands change
+    im = ax_img.imshow(rgb, interpolation="nearest")
     ax_img.set_title("Click Pixels to view Spectrum")
-    scatter_plot = ax_img.scatter([], [], c=[], s=100, marker="+", edgecolors=[])
-
-    selected_pixel = []
-    lines = []
-    colors = ["b", "g", "r", "c", "m", "y", "k"]
+    scatter_plot = ax_img.scatter(
+        [], [], c=[], s=100, marker="+", edgecolors=[], animated=True
+    )
+    scatter_plot.set_facecolors("none")
+
+    # Selected pixels in click order, stored as parallel x and y buffers filled up
+    # to `n`, with their spectra as (wavelength, intensity) segments of a single
+    # LineCollection; the set of selected (y, x) pixels answers membership in O(1)
+    capacity = _MAX_SELECTED_PIXELS
+    selected_set = set()
+    selection = {
+        "xs": np.empty(capacity, dtype=np.int32),
+        "ys": np.empty(capacity, dtype=np.int32),
+        "segments": np.empty((capacity, len(WAVELENGTHS), 2), dtype=np.float32),
+        "n": 0,
+    }
+    spectra = LineCollection([], linestyles="-", animated=True)
+    ax_spec.add_collection(spectra)
+    # The selection markers, spectrum lines and legend are animated artists: they
+    # are left out of normal draws and blitted on top of a saved background, so
+    # a click does not re-render the image and the axes.
+    backgrounds = {}
+
+    def draw_animated():
+        ax_img.draw_artist(scatter_plot)
+        ax_spec.draw_artist(spectra)
+        legend = ax_spec.get_legend()
+        if legend:
+            ax_spec.draw_artist(legend)
+
+    def on_draw(event):
+        # Full redraws (first show, resize, rescaled axes) refresh the backgrounds
+        backgrounds["img"] = fig.canvas.copy_from_bbox(ax_img.bbox)
+        backgrounds["spec"] = fig.canvas.copy_from_bbox(ax_spec.bbox)
+        draw_animated()
+
+    def blit_update():
+        if not backgrounds or not fig.canvas.supports_blit:
+            fig.canvas.draw_idle()
+            return
+        fig.canvas.restore_region(backgrounds["img"])
+        fig.canvas.restore_region(backgrounds["spec"])
+        draw_animated()
+        fig.canvas.blit(ax_img.bbox)
+        fig.canvas.blit(ax_spec.bbox)
+
+    # Fast clicks only update the artists; the redraw is deferred by a short
+    # single-shot timer and at most one is queued at a time, so a burst of
+    # clicks results in a single redraw
+    draw_pending = [False]
+    draw_timer = fig.canvas.new_timer(interval=_DRAW_DELAY_MS)
+    draw_timer.single_shot = True
+
+    def do_draw():
+        draw_pending[0] = False
+        blit_update()
+
+    draw_timer.add_callback(do_draw)
+
+    def schedule_draw():
+        if draw_pending[0]:
+            return
+        draw_pending[0] = True
+        draw_timer.start()
 
     def on_clear_button_click(event):
         # Clear the scatter plot
-        selected_pixel.clear()
+        selection["n"] = 0
+        selected_set.clear()
         scatter_plot.set_offsets(np.empty((0, 2)))
         scatter_plot.set_edgecolors([])
-        for line in lines:
-            line.remove()
-        lines.clear()
-        legend = ax_spec.legend()
+        spectra.set_segments([])
+        legend = ax_spec.get_legend()
         if legend:
             legend.remove()
         fig.canvas.draw()
@@ -58,6 +215,33 @@ def show_interactive_image_with_spectrum(hsi_data, r_band=650, g_band=550, b_ban
     clear_button.on_click(on_clear_button_click)
     display(clear_button)
 
+    # Band selectors, only a change of band recomputes and redraws the RGB image
+    band_sliders = [
+        widgets.IntSlider(
+            value=band,
+            min=int(np.ceil(WAVELENGTHS[0])),
+            max=int(np.floor(WAVELENGTHS[-1])),
+            description=f"{name} (nm)",
+            continuous_update=False,
+        )
+        for name, band in (("R", r_band), ("G", g_band), ("B", b_band))
+    ]
+
+    def on_band_change(change):
+        im.set_data(create_rgb(hsi_data, *(slider.value for slider in band_sliders)))
+        fig.canvas.draw_idle()
+
+    for slider in band_sliders:
+        slider.observe(on_band_change, names="value")
+    display(widgets.HBox(band_sliders))
+
+    # (H, W, bands) float32 copy of the cube so that each pixel's spectrum is
+    # contiguous and already in the dtype of the segment buffer; transposing and
+    # casting once here (in a single pass) is amortized over all clicks
+    hsi_hwb = np.ascontiguousarray(
+        np.moveaxis(np.asarray(hsi_data), 0, -1), dtype=np.float32
+    )
+
     def on_click(event):
         if event.inaxes == ax_img:
             # Get the pixel coordinates
@@ -66,54 +250,92 @@ def show_interactive_image_with_spectrum(hsi_data, r_band=650, g_band=550, b_ban
             pixel_coords = (y, x)
 
             # Check if the pixel is already selected
-            if pixel_coords in selected_pixel:
-                selected_pixel.remove(pixel_coords)
+            if pixel_coords in selected_set:
+                remove_pixel(pixel_coords)
             else:
-                selected_pixel.append(pixel_coords)
+                add_pixel(pixel_coords)
             update_plot()
 
+    def add_pixel(pixel_coords):
+        n = selection["n"]
+        if n == len(selection["xs"]):
+            for key in ("xs", "ys", "segments"):
+                selection[key] = np.concatenate(
+                    [selection[key], np.empty_like(selection[key])]
+                )
+        py, px = pixel_coords
+        selection["xs"][n] = px
+        selection["ys"][n] = py
+        segment = selection["segments"][n]
+        segment[:, 0] = WAVELENGTHS
+        segment[:, 1] = hsi_hwb[py, px]
+        selection["n"] = n + 1
+        selected_set.add(pixel_coords)
+
+    def remove_pixel(pixel_coords):
+        py, px = pixel_coords
+        n = selection["n"]
+        idx = _find_selected(selection["xs"], selection["ys"], n, px, py)
+
+        # Shift the later pixels down instead of swapping in the last one, so the
+        # remaining selections keep their order and colors
+        for key in ("xs", "ys", "segments"):
+            buf = selection[key]
+            buf[idx : n - 1] = buf[idx + 1 : n]
+        selection["n"] = n - 1
+        selected_set.discard(pixel_coords)
+
     def update_plot():
-        offsets = np.array([[px[1], px[0]] for px in selected_pixel])
-        scatter_plot.set_offsets(offsets)
-        marker_colors = [colors[i % len(colors)] for i in range(len(selected_pixel))]
+        n = selection["n"]
+        scatter_plot.set_offsets(
+            np.column_stack((selection["xs"][:n], selection["ys"][:n]))
+        )
+        marker_colors = _SELECTION_COLORS.take(np.arange(n), axis=0, mode="wrap")
         scatter_plot.set_edgecolors(marker_colors)
-        scatter_plot.set_facecolors("none")
-
-        for line in lines:
-            line.remove()
-        lines.clear()
-
-        for idx, (py, px) in enumerate(selected_pixel):
-            spectrum = hsi_data[:, py, px]
-            (line,) = ax_spec.plot(
-                WAVELENGTHS,
-                spectrum,
-                color=marker_colors[idx],
-                label=f"Pixel {px},{py}",
-                linestyle="-",
-                marker="o",
-            )
-            lines.append(line)
-        update_legend()
-        fig.canvas.draw_idle()
 
-    def update_legend():
+        spectra.set_segments(selection["segments"][:n])
+        spectra.set_colors(marker_colors)
+        update_legend(n, marker_colors)
+        schedule_draw()
+
+    def update_legend(n, marker_colors):
         # Clear the previous legend
-        legend = ax_spec.legend()
+        legend = ax_spec.get_legend()
         if legend:
             legend.remove()
 
-        # Create a new legend with the current lines
-        if lines:
-            ax_spec.legend(
-                lines, [line.get_label() for line in lines], loc="upper right"
+        # Create a new legend with one proxy handle per spectrum in the collection
+        if n:
+            legend = ax_spec.legend(
+                [Line2D([], [], color=color) for color in marker_colors],
+                [
+                    f"Pixel {px},{py}"
+                    for px, py in zip(selection["xs"][:n], selection["ys"][:n])
+                ],
+                loc="upper right",
             )
+            legend.set_animated(True)
 
     ax_spec.set_title("Pixel Intensity Across Channels")
     ax_spec.set_xlabel("Wavelength (nm)")
     ax_spec.set_ylabel("Intensity")
     ax_spec.grid(axis="y", linestyle="--", alpha=0.7)
 
+    # Fix the limits to the wavelength range and the finite intensity range of the
+    # cube, so adding spectra never autoscales or changes the blit background
+    finite = np.isfinite(hsi_hwb)
+    y_min = float(hsi_hwb.min(where=finite, initial=np.inf))
+    y_max = float(hsi_hwb.max(where=finite, initial=-np.inf))
+    if not np.isfinite(y_min):  # no finite values at all
+        y_min, y_max = 0.0, 1.0
+    elif y_min == y_max:
+        y_min, y_max = y_min - 0.5, y_max + 0.5
+    y_pad = 0.05 * (y_max - y_min)
+    ax_spec.set_xlim(WAVELENGTHS[0], WAVELENGTHS[-1])
+    ax_spec.set_ylim(y_min - y_pad, y_max + y_pad)
+    ax_spec.set_autoscale_on(False)
+
+    fig.canvas.mpl_connect("draw_event", on_draw)
     cid = fig.canvas.mpl_connect("button_press_event", on_click)
     plt.show()
 
@@ -138,15 +360,14 @@ def display_with_metadata(hsi_dataset, patient_id, save_to_path=None):
     None
         Displays the visualizations in the notebook
     """
-    # Get all samples for the patient
+    # Get all samples for the patient; cubes are loaded one at a time while iterating
     samples = hsi_dataset.get_samples_by_patient_id(patient_id)
 
-    if not samples:
-        print(f"No samples found for patient ID '{patient_id}'")
-        return
-
     # Display each sample with its metadata
-    for i, sample in enumerate(samples):
+    num_displayed = 0
+    for sample in samples:
+        num_displayed += 1
+
         # Create RGB image
         rgb = create_rgb(sample["hsi_cube"])
 
@@ -204,3 +425,6 @@ def display_with_metadata(hsi_dataset, patient_id, save_to_path=None):
             print(f"Saved figure to {filepath}")
 
         plt.show()
+
+    if num_displayed == 0:
+        print(f"No samples found for patient ID '{patient_id}'")
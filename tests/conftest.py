@@ -0,0 +1,16 @@
+"""
+Shared pytest setup.
+
+src.constants reads HSI_DATA_DIR and METADATA_CSV_PATH at import time. If they are
+not set, point them at the small metadata fixture in tests/data so the tests can
+run without the real dataset; exported values still take precedence.
+"""
+
+import os
+
+TEST_DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+
+os.environ.setdefault("HSI_DATA_DIR", TEST_DATA_DIR)
+os.environ.setdefault(
+    "METADATA_CSV_PATH", os.path.join(TEST_DATA_DIR, "biopsy_metadata.csv")
+)
@@ -0,0 +1,288 @@
+"""
+Tests for HSIDataset in src/dataset.py, using small Ref_hyper HDF5 files.
+"""
+
+import sys
+import os
+import pickle
+import signal
+import threading
+import time
+import concurrent.futures
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+pytest.importorskip("torch")
+h5py = pytest.importorskip("h5py")
+
+from src import dataset as dataset_module
+from src.dataset import HSIDataset
+
+BANDS, HEIGHT, WIDTH = 6, 4, 5
+
+METADATA_CSV = """id,age,sex,type_of_tumor,grading,additional_info,histology,Ki-67-index
+S1.2,45,M,Glioma,4,,GBM,20%
+S1.6,,F,,,,meningothelial,
+"""
+
+CUBE_FILES = {
+    "HyperProbe1.1_Biopsy_S1.2_FOV1.mat": 0,
+    "HyperProbe1.1_Biopsy_S1.2_FOV2.mat": 1,
+    "HyperProbe1.1_Biopsy_S1.6.mat": 2,
+}
+
+
+def _cube(seed):
+    """A (bands, height, width) float64 cube with values that identify its file."""
+    return np.random.default_rng(seed).random((BANDS, HEIGHT, WIDTH)) + seed
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """A directory with three cubes of two patients and their metadata CSV."""
+    for filename, seed in CUBE_FILES.items():
+        with h5py.File(tmp_path / filename, "w") as f:
+            f.create_dataset("Ref_hyper", data=_cube(seed))
+    (tmp_path / "metadata.csv").write_text(METADATA_CSV)
+    return tmp_path
+
+
+def _dataset(data_dir, **kwargs):
+    return HSIDataset(
+        hsi_data_dir=str(data_dir),
+        metadata_csv_path=str(data_dir / "metadata.csv"),
+        **kwargs,
+    )
+
+
+def test_samples_are_sorted_by_combined_id(data_dir):
+    ds = _dataset(data_dir)
+
+    assert len(ds) == 3
+    assert [ds[i]["combined_id"] for i in range(len(ds))] == ["1.2_1", "1.2_2", "1.6_1"]
+    np.testing.assert_allclose(ds[2]["hsi_cube"], _cube(2), rtol=1e-6)
+
+
+def test_missing_metadata_values_are_nan(data_dir):
+    ds = _dataset(data_dir)
+
+    metadata = ds.get_sample_by_combined_id("1.6_1")["metadata"]
+
+    for key in ("age", "type_of_tumor", "grading", "additional_info", "Ki-67-index"):
+        assert isinstance(metadata[key], float) and np.isnan(metadata[key]), key
+    assert metadata["histology"] == "meningothelial"
+    for sample_metadata in (ds[0]["metadata"], metadata):
+        assert not any(v is None or v is pd.NA for v in sample_metadata.values())
+
+
+def test_cached_cube_is_shared_and_read_only(data_dir):
+    ds = _dataset(data_dir)
+
+    cube = ds[0]["hsi_cube"]
+
+    assert ds[0]["hsi_cube"] is cube
+    assert not cube.flags.writeable
+    with pytest.raises(ValueError):
+        cube[:] = 0
+
+
+def test_cache_evicts_least_recently_used(data_dir):
+    cube_bytes = BANDS * HEIGHT * WIDTH * np.dtype(np.float32).itemsize
+    ds = _dataset(data_dir, cache_max_bytes=2 * cube_bytes)
+
+    first = ds[0]["hsi_cube"]
+    ds[1]
+    ds[0]  # 0 is now more recently used than 1
+    ds[2]
+
+    assert set(ds._cube_cache) == {ds._cubes_df["file_path"].iat[i] for i in (0, 2)}
+    assert ds._cube_cache_bytes == 2 * cube_bytes
+    assert ds[0]["hsi_cube"] is first
+
+
+def test_cache_disabled(data_dir):
+    ds = _dataset(data_dir, cache_max_bytes=0)
+
+    assert ds[0]["hsi_cube"] is not ds[0]["hsi_cube"]
+    assert not ds._cube_cache and ds._cube_cache_bytes == 0
+
+
+def test_re_adding_a_cached_file_keeps_byte_count(data_dir):
+    ds = _dataset(data_dir)
+    file_path = ds._cubes_df["file_path"].iat[0]
+    cube = ds[0]["hsi_cube"]
+
+    # as when two threads finish loading the same file
+    with ds._cache_lock:
+        ds._add_to_cube_cache(file_path, cube.copy())
+
+    assert len(ds._cube_cache) == 1
+    assert ds._cube_cache_bytes == cube.nbytes
+
+
+def test_cube_samples_include_metadata(data_dir):
+    ds = _dataset(data_dir)
+
+    cube_samples = ds.cube_samples
+
+    assert ds.cube_samples is cube_samples
+    assert [s["combined_id"] for s in cube_samples] == ["1.2_1", "1.2_2", "1.6_1"]
+    for i, cube_sample in enumerate(cube_samples):
+        assert set(cube_sample) == {
+            "combined_id",
+            "patient_id",
+            "fov",
+            "file_path",
+            "metadata",
+        }
+        assert cube_sample["metadata"]["normalized_id"] == cube_sample["patient_id"]
+        assert cube_sample["file_path"] == ds._cubes_df["file_path"].iat[i]
+
+
+def _wait_for_prefetches(ds):
+    concurrent.futures.wait(list(ds._prefetch.values()))
+    # the done callbacks that forget finished prefetches run just after completion
+    deadline = time.monotonic() + 5
+    while ds._prefetch and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_prefetched_cube_is_served_from_cache(data_dir, monkeypatch):
+    ds = _dataset(data_dir)
+
+    ds.prefetch(range(len(ds)))
+    _wait_for_prefetches(ds)
+
+    # no file is opened again once the prefetches are done
+    monkeypatch.setattr(dataset_module.h5py, "File", None)
+    for i in range(len(ds)):
+        np.testing.assert_allclose(ds[i]["hsi_cube"], _cube(i), rtol=1e-6)
+    assert not ds._prefetch
+    ds.close()
+    assert ds._executor is None
+
+
+def test_prefetch_respects_cache_budget(data_dir):
+    ds = _dataset(data_dir, cache_max_bytes=1)
+
+    ds.prefetch(range(len(ds)))
+    _wait_for_prefetches(ds)
+
+    assert not ds._prefetch
+    assert not ds._cube_cache
+    assert ds[1]["hsi_cube"] is not None
+    ds.close()
+
+
+def test_pickle_round_trip(data_dir):
+    ds = _dataset(data_dir)
+    ds[0]
+    ds.prefetch([1])
+
+    clone = pickle.loads(pickle.dumps(ds))
+    ds.close()
+
+    assert len(clone) == len(ds)
+    assert not clone._cube_cache and clone._cube_cache_bytes == 0
+    assert clone._executor is None and not clone._prefetch
+    np.testing.assert_array_equal(clone[1]["hsi_cube"], ds[1]["hsi_cube"])
+
+
+def test_dtype_and_band_stride(data_dir):
+    ds = _dataset(data_dir, dtype=np.float16, band_stride=2)
+
+    cube = ds[0]["hsi_cube"]
+
+    assert cube.dtype == np.float16
+    assert cube.shape == (len(range(0, BANDS, 2)), HEIGHT, WIDTH)
+    assert cube.flags.c_contiguous
+    np.testing.assert_allclose(cube, _cube(0)[::2], rtol=1e-3)
+
+
+@pytest.mark.parametrize("band_stride", [0, -1, 1.5, True])
+def test_invalid_band_stride_raises(data_dir, band_stride):
+    with pytest.raises(ValueError):
+        _dataset(data_dir, band_stride=band_stride)
+
+
+def test_lazy_cube_reads_only_indexed_part(data_dir):
+    pytest.importorskip("dask")
+    ds = _dataset(data_dir, lazy=True, band_stride=2)
+
+    cube = ds[1]["hsi_cube"]
+
+    assert not isinstance(cube, np.ndarray)
+    assert cube.shape == (len(range(0, BANDS, 2)), HEIGHT, WIDTH)
+    assert cube.dtype == np.float32
+    np.testing.assert_allclose(
+        np.asarray(cube[:, 1:3, 2:4]), _cube(1)[::2, 1:3, 2:4], rtol=1e-6
+    )
+    assert not ds._cube_cache
+    ds.close()
+    assert not ds._open_files
+
+
+def test_lazy_cube_without_dask_is_h5py_dataset(data_dir, monkeypatch):
+    monkeypatch.setattr(dataset_module, "da", None)
+    ds = _dataset(data_dir, lazy=True)
+
+    cube = ds[0]["hsi_cube"]
+
+    assert isinstance(cube, h5py.Dataset)
+    np.testing.assert_allclose(cube[2], _cube(0)[2])
+    ds.close()
+
+
+def test_patient_index_and_lookup(data_dir):
+    ds = _dataset(data_dir)
+
+    assert ds.patient_index == {"S1.2": [0, 1], "S1.6": [2]}
+    for patient_id in ("S1.2", "1.2", "S.1.2"):
+        samples = list(ds.get_samples_by_patient_id(patient_id))
+        assert [s["combined_id"] for s in samples] == ["1.2_1", "1.2_2"]
+    assert list(ds.get_samples_by_patient_id("S9.9")) == []
+    assert ds.get_sample_by_patient_and_fov("S1.2", "2")["combined_id"] == "1.2_2"
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+def test_fork_with_prefetch_in_flight(data_dir):
+    ds = _dataset(data_dir)
+    parent_pid = os.getpid()
+    release = threading.Event()
+    load_hsi_cube = ds._load_hsi_cube
+
+    def slow_load(file_path):
+        # keep the parent's read in flight, the child loads normally
+        if os.getpid() == parent_pid:
+            release.wait(5)
+        return load_hsi_cube(file_path)
+
+    ds._load_hsi_cube = slow_load
+    ds.prefetch([0])
+
+    pid = os.fork()
+    if pid == 0:  # child: must not wait for the parent's prefetch thread
+        signal.alarm(5)
+        ok = False
+        try:
+            ok = np.allclose(ds[0]["hsi_cube"], _cube(0), rtol=1e-6)
+            ds.close()
+        finally:
+            os._exit(0 if ok else 1)
+
+    _, status = os.waitpid(pid, 0)
+    release.set()
+    ds.close()
+    assert os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0
+
+
+def test_lazy_band_stride_without_dask_raises(data_dir, monkeypatch):
+    monkeypatch.setattr(dataset_module, "da", None)
+
+    with pytest.raises(ValueError):
+        _dataset(data_dir, lazy=True, band_stride=2)
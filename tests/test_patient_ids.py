@@ -1,7 +1,5 @@
-#!/usr/bin/env python3
-# filepath: /home/home/tim_ivan/thesis/tim_thesis/tests/test_patient_ids.py
 """
-This script tests the ALL_PATIENT_IDS class to verify it's working correctly.
+Tests for the ALL_PATIENT_IDS class in src/constants.py.
 """
 
 import sys
@@ -10,48 +8,47 @@ import os
 # Add project root to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-# Import the ALL_PATIENT_IDS class
-from src.constants import ALL_PATIENT_IDS
+from src.constants import ALL_PATIENT_IDS, METADATA_DF
 
 
-def main():
-    """Test the ALL_PATIENT_IDS functionality."""
-    print("Testing ALL_PATIENT_IDS class...")
+def test_direct_attribute_access():
+    # Patient IDs are exposed as attributes with dots replaced by underscores
+    assert ALL_PATIENT_IDS.S1_2 == "S1.2"
+    assert ALL_PATIENT_IDS.S1_6 == "S1.6"
+    assert ALL_PATIENT_IDS.S1_10 == "S1.10"
 
-    # Test direct attribute access (the autocomplete feature)
-    print("\nTesting direct attribute access (autocomplete feature):")
-    try:
-        # Access a patient ID directly as an attribute
-        s1_2_value = ALL_PATIENT_IDS.S1_2
-        print(f"ALL_PATIENT_IDS.S1_2 = {s1_2_value}")
 
-        # Access a few more patient IDs
-        s1_6_value = ALL_PATIENT_IDS.S1_6
-        print(f"ALL_PATIENT_IDS.S1_6 = {s1_6_value}")
-
-        s1_10_value = ALL_PATIENT_IDS.S1_10
-        print(f"ALL_PATIENT_IDS.S1_10 = {s1_10_value}")
+def test_get_all_is_sorted_and_complete():
+    all_ids = ALL_PATIENT_IDS.get_all()
 
-        print("✅ Direct attribute access works!")
-    except AttributeError as e:
-        print(f"❌ Error accessing attributes: {e}")
+    assert all_ids == sorted(all_ids)
+    assert set(all_ids) == set(METADATA_DF["normalized_id"].dropna())
+    assert {"S1.2", "S1.6", "S1.10"} <= set(all_ids)
 
-    # Get all patient IDs
-    all_ids = ALL_PATIENT_IDS.get_all()
-    print(f"\nAll patient IDs ({len(all_ids)}):")
-    print(all_ids)
 
-    # Get all tumor types
+def test_get_by_type_partitions_ids():
+    all_ids = set(ALL_PATIENT_IDS.get_all())
     tumor_types = ALL_PATIENT_IDS.get_types()
-    print(f"\nAll tumor types ({len(tumor_types)}):")
-    print(tumor_types)
 
-    # Get patient IDs by tumor type
+    assert tumor_types
+    assert tumor_types == sorted(tumor_types)
     for tumor_type in tumor_types:
         type_ids = ALL_PATIENT_IDS.get_by_type(tumor_type)
-        print(f"\nPatient IDs for {tumor_type} ({len(type_ids)}):")
-        print(type_ids)
+        assert type_ids
+        assert type_ids == sorted(type_ids)
+        assert set(type_ids) <= all_ids
+
+
+def test_get_by_type_unknown_type_is_empty():
+    assert ALL_PATIENT_IDS.get_by_type("not a tumor type") == []
+
 
+def test_returned_lists_are_copies():
+    ALL_PATIENT_IDS.get_all().clear()
+    ALL_PATIENT_IDS.get_types().clear()
+    for tumor_type in ALL_PATIENT_IDS.get_types():
+        ALL_PATIENT_IDS.get_by_type(tumor_type).clear()
 
-if __name__ == "__main__":
-    main()
+    assert "S1.2" in ALL_PATIENT_IDS.get_all()
+    assert ALL_PATIENT_IDS.get_types()
+    assert all(ALL_PATIENT_IDS.get_by_type(t) for t in ALL_PATIENT_IDS.get_types())
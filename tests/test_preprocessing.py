@@ -0,0 +1,78 @@
+"""
+Tests for the spectral normalization in src/preprocessing.py.
+"""
+
+import sys
+import os
+
+import numpy as np
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src import preprocessing
+from src.preprocessing import normalize_spectra
+
+
+@pytest.fixture
+def cube():
+    """A small (bands, height, width) cube with a different range per band."""
+    rng = np.random.default_rng(0)
+    offsets = np.arange(5, dtype=np.float32)[:, None, None]
+    return (rng.random((5, 8, 6), dtype=np.float32) * (offsets + 1) + offsets).astype(
+        np.float32
+    )
+
+
+def test_minmax_scales_each_band_to_unit_range(cube):
+    normalized = normalize_spectra(cube, method="minmax")
+
+    assert normalized.shape == cube.shape
+    assert normalized.dtype == np.float32
+    np.testing.assert_allclose(normalized.min(axis=(1, 2)), 0.0, atol=1e-6)
+    np.testing.assert_allclose(normalized.max(axis=(1, 2)), 1.0, atol=1e-6)
+
+
+def test_standard_gives_zero_mean_unit_std_per_band(cube):
+    normalized = normalize_spectra(cube, method="standard")
+
+    np.testing.assert_allclose(normalized.mean(axis=(1, 2)), 0.0, atol=1e-5)
+    np.testing.assert_allclose(normalized.std(axis=(1, 2)), 1.0, atol=1e-5)
+
+
+@pytest.mark.parametrize("method", ["minmax", "standard"])
+def test_nan_is_ignored_and_kept(cube, method):
+    cube[:, 0, 0] = np.nan
+
+    normalized = normalize_spectra(cube, method=method)
+    expected = normalize_spectra(np.delete(cube.reshape(5, -1), 0, axis=1), method)
+
+    assert np.all(np.isnan(normalized[:, 0, 0]))
+    np.testing.assert_allclose(
+        normalized.reshape(5, -1)[:, 1:], expected, rtol=1e-5, atol=1e-5
+    )
+
+
+@pytest.mark.parametrize("method", ["minmax", "standard"])
+def test_constant_band_maps_to_zero(cube, method):
+    cube[1] = 3.0
+
+    normalized = normalize_spectra(cube, method=method)
+
+    assert np.all(normalized[1] == 0.0)
+
+
+@pytest.mark.parametrize("method", ["minmax", "standard"])
+def test_numpy_fallback_matches(cube, monkeypatch, method):
+    expected = normalize_spectra(cube, method=method)
+
+    monkeypatch.setattr(preprocessing, "numba", None)
+    np.testing.assert_allclose(
+        normalize_spectra(cube, method=method), expected, rtol=1e-5, atol=1e-5
+    )
+
+
+def test_unknown_method_raises(cube):
+    with pytest.raises(ValueError):
+        normalize_spectra(cube, method="l2")
@@ -0,0 +1,123 @@
+"""
+Tests for reading the biopsy workbook in scripts/process_excel.py.
+"""
+
+import sys
+import os
+
+import pandas as pd
+import pytest
+
+# Add the scripts directory to path
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "scripts"))
+)
+
+openpyxl = pytest.importorskip("openpyxl")
+
+import process_excel
+
+COLUMN_DTYPES = {"HP Sample": "string", "age": None, "sex": "string"}
+
+
+@pytest.fixture
+def workbook_path(tmp_path):
+    """A small sheet with a blank row, a row with only unused cells and trailing blanks."""
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(["HP Sample", "age", "sex", "unused"])
+    sheet.append(["S1.2", 45, "M", None])
+    sheet.append([None, None, None, None])
+    sheet.append([None, None, None, "note"])
+    sheet.append(["S1.6", None, "F", None])
+    sheet.cell(row=8, column=1).font = openpyxl.styles.Font(bold=True)
+    path = tmp_path / "biopsy.xlsx"
+    workbook.save(path)
+    return str(path)
+
+
+def test_streamed_columns_match_read_excel(workbook_path):
+    expected = pd.read_excel(
+        workbook_path,
+        engine="openpyxl",
+        usecols=lambda c: c in COLUMN_DTYPES,
+        dtype={c: t for c, t in COLUMN_DTYPES.items() if t is not None},
+    )
+
+    streamed = process_excel._stream_excel_columns(workbook_path, COLUMN_DTYPES)
+
+    assert len(streamed) == 4
+    pd.testing.assert_frame_equal(streamed, expected, check_dtype=False)
+
+
+def _fail(*args, **kwargs):
+    raise AssertionError("the workbook should not be parsed again")
+
+
+def test_parquet_sidecar_is_reused_until_workbook_changes(workbook_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    first = process_excel.read_biopsy_sheet(workbook_path, COLUMN_DTYPES)
+    sidecar_path = workbook_path + ".parquet"
+    assert os.path.exists(sidecar_path)
+
+    with monkeypatch.context() as m:
+        m.setattr(process_excel.pd, "read_excel", _fail)
+        m.setattr(process_excel, "_stream_excel_columns", _fail)
+        cached = process_excel.read_biopsy_sheet(workbook_path, COLUMN_DTYPES)
+    pd.testing.assert_frame_equal(cached, first)
+
+    # a sidecar older than the workbook is replaced
+    stale_mtime = os.path.getmtime(workbook_path) - 10
+    os.utime(sidecar_path, (stale_mtime, stale_mtime))
+    reread = process_excel.read_biopsy_sheet(workbook_path, COLUMN_DTYPES)
+    pd.testing.assert_frame_equal(reread, first)
+    assert os.path.getmtime(sidecar_path) > stale_mtime
+
+
+def test_mixed_type_age_is_cached(tmp_path):
+    pytest.importorskip("pyarrow")
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(["HP Sample", "age", "sex"])
+    for row in (["S1.2", 45, "M"], ["S1.6", "unknown", "F"], ["S1.10", 50.5, "M"]):
+        sheet.append(row)
+    workbook_path = str(tmp_path / "biopsy.xlsx")
+    workbook.save(workbook_path)
+
+    df = process_excel.read_biopsy_sheet(workbook_path, COLUMN_DTYPES)
+
+    assert os.path.exists(workbook_path + ".parquet")
+    assert df["age"].tolist() == ["45", "unknown", "50.5"]
+    pd.testing.assert_frame_equal(
+        process_excel.read_biopsy_sheet(workbook_path, COLUMN_DTYPES), df
+    )
+
+
+def test_parquet_sidecar_is_ignored_for_other_columns(workbook_path):
+    pytest.importorskip("pyarrow")
+    process_excel.read_biopsy_sheet(workbook_path, COLUMN_DTYPES)
+
+    df = process_excel.read_biopsy_sheet(
+        workbook_path, {**COLUMN_DTYPES, "unused": "string"}
+    )
+
+    assert "unused" in df.columns
+    assert df["unused"].tolist()[2] == "note"
+
+
+def test_repeated_header_uses_first_column(tmp_path):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(["HP Sample", "sex", "age", "sex"])
+    sheet.append(["S1.2", "M", 45, "old"])
+    sheet.append(["S1.6", "F", 50, "old"])
+    workbook_path = str(tmp_path / "biopsy.xlsx")
+    workbook.save(workbook_path)
+    expected = pd.read_excel(
+        workbook_path, engine="openpyxl", usecols=lambda c: c in COLUMN_DTYPES
+    )
+
+    streamed = process_excel._stream_excel_columns(workbook_path, COLUMN_DTYPES)
+
+    assert streamed["sex"].tolist() == expected["sex"].tolist() == ["M", "F"]
+    assert streamed["HP Sample"].tolist() == ["S1.2", "S1.6"]
@@ -0,0 +1,71 @@
+"""
+Tests for create_rgb in src/visualize_data.py.
+"""
+
+import sys
+import os
+
+import numpy as np
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+matplotlib = pytest.importorskip("matplotlib")
+matplotlib.use("Agg")
+pytest.importorskip("ipywidgets")
+
+from src.visualize_data import _nearest_band, create_rgb
+from src.constants import WAVELENGTHS
+
+
+@pytest.fixture
+def cube():
+    """A (bands, height, width) float64 cube with values outside [0, 1]."""
+    return np.random.default_rng(0).random((len(WAVELENGTHS), 6, 7)) * 5 + 2
+
+
+def test_channels_are_min_max_normalized(cube):
+    rgb = create_rgb(cube)
+
+    assert rgb.shape == (6, 7, 3)
+    assert rgb.dtype == np.float32
+    np.testing.assert_allclose(rgb.min(axis=(0, 1)), 0.0, atol=1e-6)
+    np.testing.assert_allclose(rgb.max(axis=(0, 1)), 1.0, atol=1e-6)
+    red = cube[_nearest_band(650)]
+    np.testing.assert_allclose(
+        rgb[..., 0], (red - red.min()) / (red.max() - red.min()), atol=1e-6
+    )
+
+
+def test_nan_and_inf_are_mapped_into_range(cube):
+    red = _nearest_band(650)
+    cube[red, 0, 0] = np.nan
+    cube[red, 0, 1] = np.inf
+    cube[red, 0, 2] = -np.inf
+
+    rgb = create_rgb(cube)
+
+    assert np.all(np.isfinite(rgb))
+    assert rgb.min() >= 0.0 and rgb.max() <= 1.0
+    assert rgb[0, 0, 0] == 0.0 and rgb[0, 1, 0] == 1.0 and rgb[0, 2, 0] == 0.0
+    # the range comes from the finite values only
+    finite = np.isfinite(cube[red])
+    assert rgb[..., 0][finite].min() == 0.0
+    np.testing.assert_allclose(rgb[..., 0][finite].max(), 1.0, atol=1e-6)
+
+
+def test_constant_channel_maps_to_zero(cube):
+    cube[_nearest_band(450)] = 3.0
+
+    rgb = create_rgb(cube)
+
+    assert np.all(rgb[..., 2] == 0.0)
+
+
+def test_result_is_cached_and_read_only(cube):
+    rgb = create_rgb(cube)
+
+    assert create_rgb(cube) is rgb
+    assert not rgb.flags.writeable
+    assert create_rgb(cube, 600) is not rgb